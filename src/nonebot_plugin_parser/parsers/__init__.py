@@ -9,7 +9,6 @@ from .data import (
     AudioContent,
     ImageContent,
     VideoContent,
-    DynamicContent,
     GraphicsContent,
 )
 from .kuwo import KuWoParser as KuWoParser
@@ -34,7 +33,6 @@ __all__ = [
     "BaseParser",
     "BilibiliParser",
     "DouyinParser",
-    "DynamicContent",
     "GraphicsContent",
     "ImageContent",
     "KuGouParser",
@@ -13,7 +13,8 @@ P = ParamSpec("P")
 R = TypeVar("R")
 import os
 
-from httpx import AsyncClient
+from httpx import Limits, AsyncClient
+from nonebot import get_driver
 
 from .data import (
     State,
@@ -48,6 +49,24 @@ KeyPatterns = list[tuple[str, Pattern[str]]]
 
 _KEY_PATTERNS = "_key_patterns"
 
+_SHARED_CLIENTS: list[AsyncClient] = []
+
+
+def create_shared_client(**kwargs: Any) -> AsyncClient:
+    """创建供解析器长期持有的 AsyncClient, 复用连接池, 驱动关闭时统一释放"""
+    kwargs.setdefault("timeout", COMMON_TIMEOUT)
+    kwargs.setdefault("limits", Limits(max_keepalive_connections=32, max_connections=64))
+    client = AsyncClient(**kwargs)
+    _SHARED_CLIENTS.append(client)
+    return client
+
+
+@get_driver().on_shutdown
+async def _close_shared_clients():
+    for client in _SHARED_CLIENTS:
+        await client.aclose()
+    _SHARED_CLIENTS.clear()
+
 
 # 重试装饰器
 def retry(max_retries: int = 3, delay: float = 1.0):
@@ -83,15 +102,17 @@ def retry(max_retries: int = 3, delay: float = 1.0):
 
 
 # 注册处理器装饰器
-def handle(keyword: str, pattern: str, max_retries: int = 3):
-    """注册处理器装饰器"""
+def handle(keyword: str | tuple[str, ...], pattern: str | Pattern[str], max_retries: int = 3):
+    """注册处理器装饰器, 多个关键词可共用同一 pattern, pattern 可直接传入预编译的正则"""
 
     def decorator(func: HandlerFunc[T]) -> HandlerFunc[T]:
         if not hasattr(func, _KEY_PATTERNS):
             setattr(func, _KEY_PATTERNS, [])
 
         key_patterns: KeyPatterns = getattr(func, _KEY_PATTERNS)
-        key_patterns.append((keyword, compile(pattern)))
+        compiled = compile(pattern)
+        keywords = (keyword,) if isinstance(keyword, str) else keyword
+        key_patterns.extend((kw, compiled) for kw in keywords)
 
         # 应用重试装饰器，但保留原始函数的_key_patterns属性
         # wrapped_func = retry(max_retries=max_retries)(func)
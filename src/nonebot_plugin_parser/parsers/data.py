@@ -5,6 +5,12 @@ from datetime import datetime
 from dataclasses import field, dataclass
 from collections.abc import Callable, Sequence, Coroutine
 
+_RESOURCES_DIR = Path(__file__).parent.parent / "renders" / "resources"
+"""渲染资源目录"""
+_QIQI_PATH = _RESOURCES_DIR / "QIQI.jpg"
+_DEFAULT_COVER: Path | None = _QIQI_PATH if _QIQI_PATH.exists() else None
+"""默认封面, 随包分发, 启动时检查一次"""
+
 
 def repr_path_task(
     path_task: Path | Task[Path] | Callable[[], Coroutine[Any, Any, Path]],
@@ -201,6 +207,8 @@ class ParseResult:
     """转发的内容"""
     render_image: Path | None = None
     """渲染图片"""
+    plain_text: str | None = None
+    """纯文本内容缓存"""
     media_contents: list[MediaContent | Path] = field(default_factory=list)
     """延迟发送的媒体内容"""
 
@@ -227,8 +235,7 @@ class ParseResult:
                 return await cont.get_path()
 
         # 如果没有视频和图片内容，使用默认图片
-        default_image_path = Path(__file__).parent.parent / "renders" / "resources" / "QIQI.jpg"
-        return default_image_path if default_image_path.exists() else None
+        return _DEFAULT_COVER
 
     @property
     def formatted_datetime(self) -> str | None:
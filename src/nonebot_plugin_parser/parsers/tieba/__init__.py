@@ -4,35 +4,43 @@ from typing import ClassVar
 from ..base import (
     BaseParser,
     handle,
+    create_shared_client,
 )
 from ..data import Platform
-from .utils import get_post, build_comments, build_contents
+from .utils import AVATAR_PREFIX, get_post, build_comments, build_contents
 from ...constants import PlatformEnum
 
 
 class TiebaParser(BaseParser):
     platform: ClassVar[Platform] = Platform(name=PlatformEnum.TIEBA, display_name="百度贴吧")
 
+    def __init__(self):
+        super().__init__()
+        self.client = create_shared_client(
+            # 证书加载开销较大, 随解析器只创建一次
+            verify=True,
+            # 声明支持 br/gzip, httpx 会自动解压响应体
+            headers={"Accept-Encoding": "br, gzip"},
+        )
+
     @handle("tieba.baidu.com", r"tieba\.baidu\.com/p/(?P<post_id>\d+)")
     async def _parse(self, searched: Match[str]):
         # TODO: 显示吧头像
         post_id = searched.group("post_id")
 
-        posts = await get_post(int(post_id))
+        posts = await get_post(self.client, int(post_id))
 
         # 提取主题帖信息
         thread = posts.thread
         forum = posts.forum
 
         # 提取作者信息
-        author = self.create_author(
-            name=thread.user.show_name,
-            avatar_url=f"http://tb.himg.baidu.com/sys/portraith/item/{thread.user.portrait}",
-        )
+        user = thread.user
+        author = self.create_author(name=user.show_name, avatar_url=AVATAR_PREFIX + user.portrait)
 
         # 主楼正文内容
         contents = build_contents(posts)
-        comments = build_comments(posts.objs[1:], thread.user.user_id)
+        comments = build_comments(posts.objs[1:], user.user_id)
         extra = {
             "forum": {
                 "name": forum.fname,
@@ -9,12 +9,13 @@
 
 from __future__ import annotations
 
-import re
 import dataclasses as dcs
 from enum import IntEnum
 from typing import Any, Generic, TypeVar, Protocol, SupportsIndex, overload
-from functools import cached_property
-from collections.abc import Iterator
+from operator import attrgetter
+from functools import lru_cache
+from itertools import islice
+from collections.abc import Callable, Iterator
 
 import yarl
 from google.protobuf.message import Message
@@ -24,7 +25,7 @@ TypeContainer = TypeVar("TypeContainer")
 TypeFragment = TypeVar("TypeFragment")
 
 
-@dcs.dataclass
+@dcs.dataclass(slots=True)
 class FragText:
     """
     纯文本碎片
@@ -45,7 +46,7 @@ class TypeFragText(Protocol):
     text: str
 
 
-@dcs.dataclass
+@dcs.dataclass(slots=True)
 class FragEmoji:
     """
     表情碎片
@@ -70,14 +71,25 @@ class TypeFragEmoji(Protocol):
     desc: str
 
 
-_IMAGEHASH_EXP = re.compile(r"/([a-z0-9]{32,})\.")
+_IMAGEHASH_CHARS = "0123456789abcdefghijklmnopqrstuvwxyz"
+
+
+def _image_hash(src: str) -> str:
+    """从图片链接的文件名中提取百度图床hash (不少于32位的小写字母数字)"""
+    path = src.partition("?")[0]
+    start = path.rfind("/") + 1
+    end = path.find(".", start)
+    if start and end - start >= 32 and not (name := path[start:end]).strip(_IMAGEHASH_CHARS):
+        return name
+    return ""
 
 
-@dcs.dataclass
 class FragImage:
     """
     图像碎片
 
+    直接持有原始 proto, 各字段在访问时才读取
+
     Attributes:
         src (str): 小图链接 宽720px
         big_src (str): 大图链接 宽960px
@@ -88,30 +100,62 @@ class FragImage:
         hash (str): 百度图床hash
     """
 
-    src: str = dcs.field(default="", repr=False)
-    big_src: str = dcs.field(default="", repr=False)
-    origin_src: str = dcs.field(default="", repr=False)
-    origin_size: int = 0
-    show_width: int = 0
-    show_height: int = 0
-    hash: str = ""
+    __slots__ = ("_hash", "_proto", "_show_size")
+
+    def __init__(self, data_proto: Message) -> None:
+        self._proto = data_proto
+        self._hash: str | None = None
+        self._show_size: tuple[int, int] | None = None
 
     @staticmethod
     def from_tbdata(data_proto: Message) -> FragImage:
-        src = data_proto.cdn_src
-        big_src = data_proto.big_cdn_src
-        origin_src = data_proto.origin_src
-        origin_size = data_proto.origin_size
+        return FragImage(data_proto)
 
-        show_width, _, show_height = data_proto.bsize.partition(",")
-        show_width = int(show_width)
-        show_height = int(show_height)
+    @property
+    def src(self) -> str:
+        return self._proto.cdn_src
 
-        if hash_obj := _IMAGEHASH_EXP.search(src):
-            hash_ = hash_obj[1]
-        else:
-            hash_ = ""
-        return FragImage(src, big_src, origin_src, origin_size, show_width, show_height, hash_)
+    @property
+    def big_src(self) -> str:
+        return self._proto.big_cdn_src
+
+    @property
+    def origin_src(self) -> str:
+        return self._proto.origin_src
+
+    @property
+    def origin_size(self) -> int:
+        return self._proto.origin_size
+
+    @property
+    def show_width(self) -> int:
+        return self._parse_bsize()[0]
+
+    @property
+    def show_height(self) -> int:
+        return self._parse_bsize()[1]
+
+    def _parse_bsize(self) -> tuple[int, int]:
+        """解析 "宽,高" 格式的 bsize, 宽高共用一次解析结果"""
+        if self._show_size is None:
+            width, _, height = self._proto.bsize.partition(",")
+            self._show_size = (int(width or 0), int(height or 0))
+        return self._show_size
+
+    @property
+    def hash(self) -> str:
+        if self._hash is None:
+            self._hash = _image_hash(self._proto.cdn_src)
+        return self._hash
+
+    def __repr__(self) -> str:
+        return (
+            f"FragImage(origin_size={self.origin_size!r}, show_width={self.show_width!r}, "
+            f"show_height={self.show_height!r}, hash={self.hash!r})"
+        )
+
+    def __eq__(self, obj: object) -> bool:
+        return isinstance(obj, FragImage) and self._proto == obj._proto
 
 
 @dcs.dataclass
@@ -121,7 +165,7 @@ class TypeFragImage(Protocol):
     hash: str
 
 
-@dcs.dataclass
+@dcs.dataclass(slots=True)
 class FragAt:
     """
     @碎片
@@ -146,7 +190,7 @@ class TypeFragAt(Protocol):
     user_id: int
 
 
-@dcs.dataclass
+@dcs.dataclass(slots=True)
 class FragVoice:
     """
     音频碎片
@@ -169,12 +213,19 @@ class FragVoice:
         return bool(self.md5)
 
 
+_EMPTY_VOICE = FragVoice()
+"""无音频时共用的空碎片, 只会被整体替换, 不会被修改"""
+
+
 class TypeFragVoice(Protocol):
     md5: str
     duration: int
 
 
-@dcs.dataclass
+_VIDEO_ATTRS = attrgetter("video_url", "thumbnail_url", "video_duration", "video_width", "video_height", "play_count")
+
+
+@dcs.dataclass(slots=True)
 class FragVideo:
     """
     视频碎片
@@ -197,18 +248,16 @@ class FragVideo:
 
     @staticmethod
     def from_tbdata(data_proto: Message) -> FragVideo:
-        src = data_proto.video_url
-        cover_src = data_proto.thumbnail_url
-        duration = data_proto.video_duration
-        width = data_proto.video_width
-        height = data_proto.video_height
-        view_num = data_proto.play_count
-        return FragVideo(src, cover_src, duration, width, height, view_num)
+        return FragVideo(*_VIDEO_ATTRS(data_proto))
 
     def __bool__(self) -> bool:
         return bool(self.width)
 
 
+_EMPTY_VIDEO = FragVideo()
+"""无视频时共用的空碎片, 只会被整体替换, 不会被修改"""
+
+
 class TypeFragVideo(Protocol):
     src: str
     cover_src: str
@@ -218,7 +267,13 @@ class TypeFragVideo(Protocol):
     view_num: int
 
 
-@dcs.dataclass
+@lru_cache(maxsize=256)
+def _parse_url(url: str) -> yarl.URL:
+    """解析链接, 同一帖子中的链接大量重复, yarl.URL 不可变可安全共享"""
+    return yarl.URL(url)
+
+
+@dcs.dataclass(slots=True)
 class FragLink:
     """
     链接碎片
@@ -234,21 +289,20 @@ class FragLink:
     text: str = ""
     title: str = ""
     raw_url: yarl.URL = dcs.field(default_factory=yarl.URL)
+    url: yarl.URL = dcs.field(default_factory=yarl.URL, repr=False)
+    is_external: bool = dcs.field(default=False, repr=False)
 
     @staticmethod
     def from_tbdata(data_proto: Message) -> FragLink:
         text = data_proto.link
         title = data_proto.text
-        raw_url = yarl.URL(text)
-        return FragLink(text, title, raw_url)
-
-    @cached_property
-    def url(self) -> yarl.URL:
-        return yarl.URL(self.raw_url.query["url"]) if self.is_external else self.raw_url
-
-    @cached_property
-    def is_external(self) -> bool:
-        return self.raw_url.path == "/mo/q/checkurl"
+        raw_url = _parse_url(text)
+        is_external = raw_url.path == "/mo/q/checkurl"
+        url = raw_url
+        # 外链跳转页可能缺少 url 参数, 此时退回原链接
+        if is_external and (target := raw_url.query.get("url")):
+            url = _parse_url(target)
+        return FragLink(text, title, raw_url, url, is_external)
 
 
 class TypeFragLink(Protocol):
@@ -263,7 +317,7 @@ class TypeFragLink(Protocol):
     def is_external(self) -> bool: ...
 
 
-@dcs.dataclass
+@dcs.dataclass(slots=True)
 class FragTiebaPlus:
     """
     贴吧plus广告碎片
@@ -279,7 +333,7 @@ class FragTiebaPlus:
     @staticmethod
     def from_tbdata(data_proto: Message) -> FragTiebaPlus:
         text = data_proto.tiebaplus_info.desc
-        url = yarl.URL(data_proto.tiebaplus_info.jump_url)
+        url = _parse_url(data_proto.tiebaplus_info.jump_url)
         return FragTiebaPlus(text, url)
 
 
@@ -288,7 +342,7 @@ class TypeFragTiebaPlus(Protocol):
     url: yarl.URL
 
 
-@dcs.dataclass
+@dcs.dataclass(slots=True)
 class FragItem:
     """
     item碎片
@@ -309,7 +363,7 @@ class TypeFragItem(Protocol):
     text: str
 
 
-@dcs.dataclass
+@dcs.dataclass(slots=True)
 class FragUnknown:
     """
     未知碎片
@@ -325,7 +379,7 @@ class FragUnknown:
         return FragUnknown(data)
 
 
-@dcs.dataclass
+@dcs.dataclass(slots=True)
 class VoteOption:
     """
     投票选项信息
@@ -345,7 +399,7 @@ class VoteOption:
         return VoteOption(vote_num, text)
 
 
-@dcs.dataclass
+@dcs.dataclass(slots=True)
 class VoteInfo:
     """
     投票信息
@@ -380,7 +434,7 @@ class VoteInfo:
         return bool(self.options)
 
 
-@dcs.dataclass
+@dcs.dataclass(slots=True)
 class Containers(Generic[TypeContainer]):
     """
     内容列表的泛型基类
@@ -393,7 +447,7 @@ class Containers(Generic[TypeContainer]):
     objs: list[TypeContainer] = dcs.field(default_factory=list)
 
     def __iter__(self) -> Iterator[TypeContainer]:
-        return self.objs.__iter__()
+        return iter(self.objs)
 
     @overload
     def __getitem__(self, idx: SupportsIndex) -> TypeContainer: ...
@@ -402,7 +456,7 @@ class Containers(Generic[TypeContainer]):
     def __getitem__(self, idx: slice) -> list[TypeContainer]: ...
 
     def __getitem__(self, idx):
-        return self.objs.__getitem__(idx)
+        return self.objs[idx]
 
     def __setitem__(self, idx, val):
         raise NotImplementedError
@@ -411,7 +465,7 @@ class Containers(Generic[TypeContainer]):
         raise NotImplementedError
 
     def __len__(self) -> int:
-        return self.objs.__len__()
+        return len(self.objs)
 
     def __bool__(self) -> bool:
         return bool(self.objs)
@@ -464,7 +518,13 @@ class PrivReply(IntEnum):
     FOLLOW = 6
 
 
-@dcs.dataclass
+# 直接查表, 绕开 IntEnum 构造时的查找开销
+_GENDERS: dict[int, Gender] = {int(m): m for m in Gender}
+_PRIV_LIKES: dict[int, PrivLike] = {int(m): m for m in PrivLike}
+_PRIV_REPLIES: dict[int, PrivReply] = {int(m): m for m in PrivReply}
+
+
+@dcs.dataclass(slots=True)
 class Contents(
     Containers[
         FragText | FragEmoji | FragImage | FragAt | FragLink | FragVoice | FragVideo | FragTiebaPlus | FragUnknown
@@ -494,82 +554,135 @@ class Contents(
     ats: list[FragAt] = dcs.field(default_factory=list, repr=False)
     links: list[FragLink] = dcs.field(default_factory=list, repr=False)
     tiebapluses: list[FragTiebaPlus] = dcs.field(default_factory=list, repr=False)
-    video: FragVideo = dcs.field(default_factory=FragVideo, repr=False)
-    voice: FragVoice = dcs.field(default_factory=FragVoice, repr=False)
+    video: FragVideo = dcs.field(default_factory=lambda: _EMPTY_VIDEO, repr=False)
+    voice: FragVoice = dcs.field(default_factory=lambda: _EMPTY_VOICE, repr=False)
+    text: str = dcs.field(default="", repr=False)
 
     @staticmethod
-    def from_tbdata(data_proto: Message) -> Contents:
-        content_protos = data_proto.content
-
-        texts = []
-        emojis = []
-        imgs = []
-        ats = []
-        links = []
-        tiebapluses = []
-        video = FragVideo()
-        voice = FragVoice()
-
-        def _frags():
-            for proto in content_protos:
-                _type = proto.type
-                # 0纯文本 9电话号 18话题 27百科词条 40梗百科
-                if _type in [0, 9, 18, 27, 40]:
-                    frag = FragText.from_tbdata(proto)
-                    texts.append(frag)
-                    yield frag
-                # 11:tid=5047676428
-                elif _type in [2, 11]:
-                    frag = FragEmoji.from_tbdata(proto)
-                    emojis.append(frag)
-                    yield frag
-                # 20:tid=5470214675
-                elif _type in [3, 20]:
-                    frag = FragImage.from_tbdata(proto)
-                    imgs.append(frag)
-                    yield frag
-                elif _type == 4:
-                    frag = FragAt.from_tbdata(proto)
-                    ats.append(frag)
-                    texts.append(frag)
-                    yield frag
-                elif _type == 1:
-                    frag = FragLink.from_tbdata(proto)
-                    links.append(frag)
-                    texts.append(frag)
-                    yield frag
-                elif _type == 10:  # voice
-                    frag = FragVoice.from_tbdata(proto)
-                    nonlocal voice
-                    voice = frag
-                    yield frag
-                elif _type == 5:  # video
-                    frag = FragVideo.from_tbdata(proto)
-                    nonlocal video
-                    video = frag
-                    yield frag
-                # 35|36:tid=7769728331 / 37:tid=7760184147
-                elif _type in [35, 36, 37]:
-                    frag = FragTiebaPlus.from_tbdata(proto)
-                    tiebapluses.append(frag)
-                    texts.append(frag)
-                    yield frag
-                # outdated tiebaplus
-                elif _type == 34:
-                    continue
-                else:
-                    yield FragUnknown.from_tbdata(proto)
-
-        objs = list(_frags())
-
-        return Contents(objs, texts, emojis, imgs, ats, links, tiebapluses, video, voice)
-
-    @cached_property
-    def text(self) -> str:
-        return "".join(frag.text for frag in self.texts)
-
-
-@dcs.dataclass
+    def from_tbdata(data_proto: Message, start: int = 0) -> Contents:
+        """
+        :param data_proto: 含 content 字段的 proto
+        :param start: 从第几个内容碎片开始解析
+        """
+        contents = Contents()
+        # 循环内只做局部变量查找
+        get_handler = _FRAG_HANDLERS.get
+        protos = islice(data_proto.content, start, None) if start else data_proto.content
+        for proto in protos:
+            get_handler(proto.type, _add_unknown)(contents, proto)
+        contents.join_text()
+        return contents
+
+    def join_text(self) -> None:
+        """根据文本碎片列表重新生成文本内容"""
+        self.text = "".join([frag.text for frag in self.texts])
+
+
+def _add_text(contents: Contents, proto: Message) -> None:
+    frag = FragText.from_tbdata(proto)
+    contents.objs.append(frag)
+    contents.texts.append(frag)
+
+
+def _add_emoji(contents: Contents, proto: Message) -> None:
+    frag = FragEmoji.from_tbdata(proto)
+    contents.objs.append(frag)
+    contents.emojis.append(frag)
+
+
+def _add_image(contents: Contents, proto: Message) -> None:
+    frag = FragImage(proto)
+    contents.objs.append(frag)
+    contents.imgs.append(frag)
+
+
+def _add_at(contents: Contents, proto: Message) -> None:
+    frag = FragAt.from_tbdata(proto)
+    contents.objs.append(frag)
+    contents.ats.append(frag)
+    contents.texts.append(frag)
+
+
+def _add_link(contents: Contents, proto: Message) -> None:
+    frag = FragLink.from_tbdata(proto)
+    contents.objs.append(frag)
+    contents.links.append(frag)
+    contents.texts.append(frag)
+
+
+def _add_voice(contents: Contents, proto: Message) -> None:
+    frag = FragVoice.from_tbdata(proto)
+    contents.objs.append(frag)
+    contents.voice = frag
+
+
+def _add_video(contents: Contents, proto: Message) -> None:
+    frag = FragVideo.from_tbdata(proto)
+    contents.objs.append(frag)
+    contents.video = frag
+
+
+def _add_tiebaplus(contents: Contents, proto: Message) -> None:
+    frag = FragTiebaPlus.from_tbdata(proto)
+    contents.objs.append(frag)
+    contents.tiebapluses.append(frag)
+    contents.texts.append(frag)
+
+
+def _skip(contents: Contents, proto: Message) -> None:
+    pass
+
+
+def _add_unknown(contents: Contents, proto: Message) -> None:
+    contents.objs.append(FragUnknown.from_tbdata(proto))
+
+
+_FRAG_HANDLERS: dict[int, Callable[[Contents, Message], None]] = {
+    # 0纯文本 9电话号 18话题 27百科词条 40梗百科
+    0: _add_text,
+    9: _add_text,
+    18: _add_text,
+    27: _add_text,
+    40: _add_text,
+    # 11:tid=5047676428
+    2: _add_emoji,
+    11: _add_emoji,
+    # 20:tid=5470214675
+    3: _add_image,
+    20: _add_image,
+    4: _add_at,
+    1: _add_link,
+    10: _add_voice,
+    5: _add_video,
+    # 35|36:tid=7769728331 / 37:tid=7760184147
+    35: _add_tiebaplus,
+    36: _add_tiebaplus,
+    37: _add_tiebaplus,
+    # outdated tiebaplus
+    34: _skip,
+}
+"""proto.type 到内容碎片处理函数的映射"""
+
+
+_USER_ATTRS = attrgetter(
+    "id",
+    "portrait",
+    "name",
+    "name_show",
+    "level_id",
+    "user_growth.level_id",
+    "gender",
+    "ip_address",
+    "iconinfo",
+    "is_bawu",
+    "new_tshow_icon",
+    "new_god_data.status",
+    "priv_sets.like",
+    "priv_sets.reply",
+)
+
+
+@dcs.dataclass(slots=True)
 class UserInfo:
     """
     用户信息
@@ -616,22 +729,30 @@ class UserInfo:
 
     @staticmethod
     def from_tbdata(data_proto: Message) -> UserInfo:
-        user_id = data_proto.id
-        portrait = data_proto.portrait
-        if "?" in portrait:
-            portrait = portrait[:-13]
-        user_name = data_proto.name
-        nick_name_new = data_proto.name_show
-        level = data_proto.level_id
-        glevel = data_proto.user_growth.level_id
-        gender = Gender(data_proto.gender)
-        ip = data_proto.ip_address
-        icons = [name for i in data_proto.iconinfo if (name := i.name)]
-        is_bawu = bool(data_proto.is_bawu)
-        is_vip = bool(data_proto.new_tshow_icon)
-        is_god = bool(data_proto.new_god_data.status)
-        priv_like = PrivLike(priv_like) if (priv_like := data_proto.priv_sets.like) else PrivLike.PUBLIC
-        priv_reply = PrivReply(priv_reply) if (priv_reply := data_proto.priv_sets.reply) else PrivReply.ALL
+        (
+            user_id,
+            portrait,
+            user_name,
+            nick_name_new,
+            level,
+            glevel,
+            gender,
+            ip,
+            iconinfo,
+            is_bawu,
+            is_vip,
+            is_god,
+            priv_like,
+            priv_reply,
+        ) = _USER_ATTRS(data_proto)
+        portrait = portrait.partition("?")[0]
+        gender = _GENDERS.get(gender, Gender.UNKNOWN)
+        icons = [name for i in iconinfo if (name := i.name)]
+        is_bawu = bool(is_bawu)
+        is_vip = bool(is_vip)
+        is_god = bool(is_god)
+        priv_like = _PRIV_LIKES.get(priv_like, PrivLike.PUBLIC)
+        priv_reply = _PRIV_REPLIES.get(priv_reply, PrivReply.ALL)
         return UserInfo(
             user_id,
             portrait,
@@ -669,7 +790,7 @@ class UserInfo:
     def show_name(self) -> str:
         return self.nick_name_new or self.user_name
 
-    @cached_property
+    @property
     def log_name(self) -> str:
         if self.user_name:
             return self.user_name
@@ -679,7 +800,7 @@ class UserInfo:
             return str(self.user_id)
 
 
-@dcs.dataclass
+@dcs.dataclass(slots=True)
 class Comment:
     """
     楼中楼信息
@@ -723,31 +844,30 @@ class Comment:
 
     @staticmethod
     def from_tbdata(data_proto: Message) -> Comment:
-        contents = Contents.from_tbdata(data_proto)
-
+        # "回复 " + @被回复者 开头的楼中楼, 直接跳过这两个碎片
         reply_to_id = 0
-        if contents:
-            first_frag = contents[0]
-            if (
-                isinstance(first_frag, FragText)
-                and first_frag.text == "回复 "
-                and (reply_to_id := data_proto.content[1].uid)
-            ):
-                reply_to_id = reply_to_id
-                if isinstance(contents[1], FragAt):
-                    del contents.ats[0]
-                contents.objs = contents.objs[2:]
-                contents.texts = contents.texts[2:]
-                if contents.texts:
-                    first_text_frag = contents.texts[0]
-                    first_text_frag.text = first_text_frag.text.removeprefix(" :")
-
-        contents = contents
+        content_protos = data_proto.content
+        if (
+            len(content_protos) > 1
+            and _FRAG_HANDLERS.get((first_proto := content_protos[0]).type) is _add_text
+            and first_proto.text == "回复 "
+        ):
+            reply_to_id = content_protos[1].uid
+
+        if reply_to_id:
+            contents = Contents.from_tbdata(data_proto, start=2)
+            if contents.texts:
+                first_text_frag = contents.texts[0]
+                first_text_frag.text = first_text_frag.text.removeprefix(" :")
+                contents.join_text()
+        else:
+            contents = Contents.from_tbdata(data_proto)
 
         pid = data_proto.id
         author_id = data_proto.author_id
-        agree = data_proto.agree.agree_num
-        disagree = data_proto.agree.disagree_num
+        agree_proto = data_proto.agree
+        agree = agree_proto.agree_num
+        disagree = agree_proto.disagree_num
         create_time = data_proto.time
 
         return Comment(
@@ -778,7 +898,7 @@ class Comment:
         return self.contents.text
 
 
-@dcs.dataclass
+@dcs.dataclass(slots=True)
 class Post:
     """
     楼层信息
@@ -827,15 +947,19 @@ class Post:
     @staticmethod
     def from_tbdata(data_proto: Message) -> Post:
         contents = Contents.from_tbdata(data_proto)
-        sign = "".join(p.text for p in data_proto.signature.content if p.type == 0)
-        comments = [Comment.from_tbdata(p) for p in data_proto.sub_post_list.sub_post_list]
+        # 大部分楼层没有小尾巴
+        sign_protos = data_proto.signature.content
+        sign = "".join([p.text for p in sign_protos if p.type == 0]) if sign_protos else ""
+        sub_posts = data_proto.sub_post_list.sub_post_list
+        comments = [Comment.from_tbdata(p) for p in sub_posts] if sub_posts else []
         is_aimeme = bool(data_proto.sprite_meme_info.meme_id)
         pid = data_proto.id
         author_id = data_proto.author_id
         floor = data_proto.floor
         reply_num = data_proto.sub_post_number
-        agree = data_proto.agree.agree_num
-        disagree = data_proto.agree.disagree_num
+        agree_proto = data_proto.agree
+        agree = agree_proto.agree_num
+        disagree = agree_proto.disagree_num
         create_time = data_proto.time
         return Post(
             contents,
@@ -862,12 +986,12 @@ class Post:
     def __hash__(self) -> int:
         return self.pid
 
-    @cached_property
+    @property
     def text(self) -> str:
         return f"{self.contents.text}\n{self.sign}" if self.sign else self.contents.text
 
 
-@dcs.dataclass
+@dcs.dataclass(slots=True)
 class Page:
     """
     页信息
@@ -901,7 +1025,7 @@ class Page:
         return Page(page_size, current_page, total_page, total_count, has_more, has_prev)
 
 
-@dcs.dataclass
+@dcs.dataclass(slots=True)
 class Forum:
     """
     吧信息
@@ -937,7 +1061,7 @@ class Forum:
         return Forum(fid, fname, category, subcategory, member_num, post_num)
 
 
-@dcs.dataclass
+@dcs.dataclass(slots=True)
 class ShareThread:
     """
     被分享的主题帖信息
@@ -982,12 +1106,28 @@ class ShareThread:
     def __hash__(self) -> int:
         return self.pid
 
-    @cached_property
+    @property
     def text(self) -> str:
         return f"{self.title}\n{self.contents.text}" if self.title else self.contents.text
 
 
-@dcs.dataclass
+_THREAD_ATTRS = attrgetter(
+    "title",
+    "id",
+    "post_id",
+    "author",
+    "thread_type",
+    "is_share_thread",
+    "reply_num",
+    "share_num",
+    "agree.agree_num",
+    "agree.disagree_num",
+    "create_time",
+    "origin_thread_info",
+)
+
+
+@dcs.dataclass(slots=True)
 class Thread:
     """
     主题帖信息
@@ -1041,29 +1181,32 @@ class Thread:
 
     @staticmethod
     def from_tbdata(data_proto: Message) -> Thread:
-        thread_proto = data_proto.thread
-        title = thread_proto.title
-        tid = thread_proto.id
-        pid = thread_proto.post_id
-        user = UserInfo.from_tbdata(thread_proto.author)
-        type_ = thread_proto.thread_type
-        is_share = bool(thread_proto.is_share_thread)
+        (
+            title,
+            tid,
+            pid,
+            author_proto,
+            type_,
+            is_share,
+            reply_num,
+            share_num,
+            agree,
+            disagree,
+            create_time,
+            origin_proto,
+        ) = _THREAD_ATTRS(data_proto.thread)
+        user = UserInfo.from_tbdata(author_proto)
+        is_share = bool(is_share)
         view_num = data_proto.thread_freq_num
-        reply_num = thread_proto.reply_num
-        share_num = thread_proto.share_num
-        agree = thread_proto.agree.agree_num
-        disagree = thread_proto.agree.disagree_num
-        create_time = thread_proto.create_time
 
         if not is_share:
-            real_thread_proto = thread_proto.origin_thread_info
-            contents = Contents.from_tbdata(real_thread_proto)
-            vote_info = VoteInfo.from_tbdata(real_thread_proto.poll_info)
+            contents = Contents.from_tbdata(origin_proto)
+            vote_info = VoteInfo.from_tbdata(origin_proto.poll_info)
             share_origin = ShareThread()
         else:
             contents = Contents()
             vote_info = VoteInfo()
-            share_origin = ShareThread.from_tbdata(thread_proto.origin_thread_info)
+            share_origin = ShareThread.from_tbdata(origin_proto)
 
         return Thread(
             contents,
@@ -1104,7 +1247,7 @@ class Thread:
         return self.type == 71
 
 
-@dcs.dataclass
+@dcs.dataclass(slots=True)
 class Posts(Containers[Post]):
     """
     回复列表
@@ -1136,20 +1279,31 @@ class Posts(Containers[Post]):
 
         objs = [Post.from_tbdata(p) for p in data_proto.post_list if not p.chat_content.bot_uk]
         users = {p.id: UserInfo.from_tbdata(p) for p in data_proto.user_list}
+
+        # 循环中不变的值提前取出
+        fid = forum.fid
+        fname = forum.fname
+        tid = thread.tid
+        thread_author_id = thread.author_id
         for post in objs:
-            post.fid = forum.fid
-            post.fname = forum.fname
-            post.tid = thread.tid
-            post.user = users[post.author_id]
-            post.is_thread_author = thread.author_id == post.author_id
+            author_id = post.author_id
+            post.fid = fid
+            post.fname = fname
+            post.tid = tid
+            post.user = users[author_id]
+            post.is_thread_author = author_id == thread_author_id
+
+            pid = post.pid
+            floor = post.floor
             for comment in post.comments:
-                comment.fid = post.fid
-                comment.fname = post.fname
-                comment.tid = post.tid
-                comment.ppid = post.pid
-                comment.floor = post.floor
-                comment.user = users[comment.author_id]
-                comment.is_thread_author = thread.author_id == comment.author_id
+                author_id = comment.author_id
+                comment.fid = fid
+                comment.fname = fname
+                comment.tid = tid
+                comment.ppid = pid
+                comment.floor = floor
+                comment.user = users[author_id]
+                comment.is_thread_author = author_id == thread_author_id
 
         return Posts(objs, page, forum, thread)
 
@@ -1,9 +1,11 @@
 # pyright: reportAttributeAccessIssue=false
 
-import contextlib
+from time import strftime, localtime
 from typing import Any
 from pathlib import Path
-from datetime import datetime
+from functools import cache, lru_cache
+from dataclasses import field, dataclass
+from collections.abc import Callable
 
 from httpx import AsyncClient, NetworkError
 from google.protobuf import descriptor_pb2, descriptor_pool
@@ -16,64 +18,125 @@ from ...constants import COMMON_HEADER
 
 headers = COMMON_HEADER.copy()
 
+AVATAR_PREFIX = "http://tb.himg.baidu.com/sys/portraith/item/"
 
+
+@lru_cache(maxsize=1024)
+def _format_minute(minute: int) -> str:
+    """按分钟格式化时间, 同一分钟内的评论共享缓存结果"""
+    return strftime("%Y-%m-%d %H:%M", localtime(minute * 60))
+
+
+def _format_time(timestamp: int) -> str:
+    """格式化评论时间, 无效时间返回空字符串"""
+    if not timestamp:
+        return ""
+    try:
+        return _format_minute(timestamp // 60)
+    except Exception:
+        return ""
+
+
+@dataclass(slots=True)
+class CommentAuthor:
+    """评论作者"""
+
+    name: str
+    """昵称"""
+    avatar: str
+    """头像链接"""
+
+
+@dataclass(slots=True)
+class CommentView:
+    """模板使用的评论数据"""
+
+    author: CommentAuthor
+    """评论作者"""
+    content: str
+    """评论 HTML 内容"""
+    formatted_time: str
+    """格式化后的评论时间"""
+    ups: int
+    """点赞数"""
+    comments: int = 0
+    """楼中楼数量"""
+    child_posts: list["CommentView"] = field(default_factory=list)
+    """楼中楼列表"""
+
+
+# 所有 .desc 共用一个描述符池, 已注册的 proto 文件不重复添加
+_POOL = descriptor_pool.DescriptorPool()
+_POOL_FILES: set[str] = set()
+
+
+@cache
 def get_message(name: str):
     fds = descriptor_pb2.FileDescriptorSet()
     fds.ParseFromString((Path(__file__).parent / f"{name}.desc").read_bytes())
-    pool = descriptor_pool.DescriptorPool()
     for fd in fds.file:
-        pool.Add(fd)
+        if fd.name not in _POOL_FILES:
+            _POOL.Add(fd)
+            _POOL_FILES.add(fd.name)
 
-    msg_descriptor = pool.FindMessageTypeByName(name)
+    msg_descriptor = _POOL.FindMessageTypeByName(name)
     return GetMessageClass(msg_descriptor)
 
 
-def make_req(tid: int) -> bytes:
+@cache
+def _req_template():
+    """除帖子 id 外的请求字段都是固定的, 只填充一次"""
     req_proto = get_message("PbPageReqIdl")()
-    req_proto.data.common._client_type = 2
-    req_proto.data.common._client_version = "12.64.1.1"
+    data = req_proto.data
+    data.common._client_type = 2
+    data.common._client_version = "12.64.1.1"
+    data.pn = 1
+    data.rn = 30
+    data.r = 0
+    data.lz = 0
+    # 以下均为 int32 字段, 新版 protobuf 不再接受 bool
+    data.with_floor = 1
+    data.floor_sort_type = 1
+    data.floor_rn = 4
+    return req_proto
+
+
+def make_req(tid: int) -> bytes:
+    template = _req_template()
+    req_proto = type(template)()
+    req_proto.CopyFrom(template)
     req_proto.data.kz = tid
-    req_proto.data.pn = 1
-    req_proto.data.rn = 30
-    req_proto.data.r = 0
-    req_proto.data.lz = 0
-    req_proto.data.with_floor = True
-    req_proto.data.floor_sort_type = True
-    req_proto.data.floor_rn = 4
     return req_proto.SerializeToString()
 
 
-async def pack_req(data: bytes) -> bytes:
+# multipart 请求体使用固定 boundary, 首尾部分只需编码一次
+_BOUNDARY = "-*_r1999"
+_MULTIPART_PREFIX = f'--{_BOUNDARY}\r\nContent-Disposition: form-data; name="data"; filename="file"\r\n\r\n'.encode()
+_MULTIPART_SUFFIX = f"\r\n--{_BOUNDARY}--\r\n".encode()
+_PB_HEADERS = {
+    "x_bd_data_type": "protobuf",
+    "User-Agent": "miku/39",
+    "Host": "tiebac.baidu.com",
+    # 设置 Content-Type，带上固定 boundary
+    "Content-Type": f"multipart/form-data; boundary={_BOUNDARY}",
+}
+
+
+async def pack_req(client: AsyncClient, data: bytes) -> bytes:
     """
     打包移动端protobuf请求
 
+    :param client: 发送请求的 AsyncClient
     :param data: protobuf序列化后的二进制数据
     :return: bytes
     """
-    boundary = "-*_r1999"
-
-    body = (
-        (f"--{boundary}\r\n" f'Content-Disposition: form-data; name="data"; filename="file"\r\n' f"\r\n").encode()
-        + data
-        + f"\r\n--{boundary}--\r\n".encode()
+    response = await client.post(
+        "http://tiebac.baidu.com/c/f/pb/page",
+        headers=_PB_HEADERS,
+        params={"cmd": 302001},
+        content=b"".join((_MULTIPART_PREFIX, data, _MULTIPART_SUFFIX)),
     )
-
-    # 设置 Content-Type，带上固定 boundary
-    async with AsyncClient(verify=False) as client:
-        response = await client.post(
-            "http://tiebac.baidu.com/c/f/pb/page",
-            headers={
-                "x_bd_data_type": "protobuf",
-                "Connection": "keep-alive",
-                "Accept-Encoding": "gzip",
-                "User-Agent": "miku/39",
-                "Host": "tiebac.baidu.com",
-                "Content-Type": f"multipart/form-data; boundary={boundary}",
-            },
-            params={"cmd": 302001},
-            content=body,
-        )
-        return response.content
+    return response.content
 
 
 def parse_res(data: bytes) -> Posts:
@@ -86,12 +149,69 @@ def parse_res(data: bytes) -> Posts:
     return Posts.from_tbdata(data_proto)
 
 
-async def get_post(tid: int) -> Posts:
+async def get_post(client: AsyncClient, tid: int) -> Posts:
     req = make_req(tid)
-    data = await pack_req(req)
+    data = await pack_req(client, req)
     return parse_res(data)
 
 
+_EMOJI_URL_PREFIX = "https://tb3.bdstatic.com/emoji/"
+_STICKER_HTML_PREFIX = f'<img class="sticker small" src="{_EMOJI_URL_PREFIX}'
+_IMAGE_HTML_PREFIX = '<div class="images-container"><div class="images-grid single"><div class="image-item"><img src="'
+_IMAGE_HTML_SUFFIX = '"></div></div></div>'
+
+
+def _merge_text(contents: list[MediaContent | str], text: str) -> None:
+    """如果上一项是文本，则追加到上一项末尾"""
+    if contents and isinstance(contents[-1], str):
+        contents[-1] += text
+    else:
+        contents.append(text)
+
+
+def _content_text(contents: list[MediaContent | str], part: FragText) -> None:
+    contents.append(part.text)
+
+
+def _content_emoji(contents: list[MediaContent | str], part: FragEmoji) -> None:
+    sticker_task = DOWNLOADER.download_img(_EMOJI_URL_PREFIX + part.id + "@2x.png", ext_headers=headers)
+    contents.append(StickerContent(sticker_task, "small", part.desc))
+
+
+def _content_image(contents: list[MediaContent | str], part: FragImage) -> None:
+    image_task = DOWNLOADER.download_img(part.origin_src, ext_headers=headers)
+    contents.append(GraphicsContent(image_task))
+
+
+def _content_at(contents: list[MediaContent | str], part: FragAt) -> None:
+    _merge_text(contents, f"@{part.text}&nbsp;")  # &nbsp;
+
+
+def _content_link(contents: list[MediaContent | str], part: FragLink) -> None:
+    _merge_text(contents, str(part.url))
+
+
+def _content_video(contents: list[MediaContent | str], part: FragVideo) -> None:
+    video_task = DOWNLOADER.download_video(part.src, ext_headers=headers)
+    cover_task = DOWNLOADER.download_img(part.cover_src, ext_headers=headers)
+    contents.append(VideoContent(video_task, cover_task, part.duration))
+
+
+_CONTENT_BUILDERS: dict[type, Callable[[list[MediaContent | str], Any], None]] = {
+    FragText: _content_text,
+    FragEmoji: _content_emoji,
+    FragImage: _content_image,
+    FragAt: _content_at,
+    FragLink: _content_link,
+    FragVideo: _content_video,
+    # 经过测试，所有帖子中的语音均无法播放，无法进行地址捕获
+    # 现在好像也发不了这玩意了
+    # 最近的语音消息在2018年
+    # FragVoice: _content_voice,
+}
+"""内容碎片类型到富文本构建函数的映射"""
+
+
 def build_contents(posts: Posts) -> list[MediaContent | str]:
     """
     构建帖子内容
@@ -103,136 +223,108 @@ def build_contents(posts: Posts) -> list[MediaContent | str]:
     contents: list[MediaContent | str] = [posts.thread.title]
 
     # 提取帖子正文
+    get_builder = _CONTENT_BUILDERS.get
     for part in posts.objs[0].contents.objs:
-        if isinstance(part, FragText):
-            contents.append(part.text)
-        elif isinstance(part, FragEmoji):
-            sticker_task = DOWNLOADER.download_img(
-                f"https://tb3.bdstatic.com/emoji/{part.id}@2x.png",
-                ext_headers=headers,
-            )
-            contents.append(StickerContent(sticker_task, "small", part.desc))
-        elif isinstance(part, FragImage):
-            image_task = DOWNLOADER.download_img(part.origin_src, ext_headers=headers)
-            contents.append(GraphicsContent(image_task))
-        elif isinstance(part, FragAt):
-            # 如果上一项是文本，则追加到上一项末尾
-            if contents and isinstance(contents[-1], str):
-                contents[-1] += f"@{part.text}&nbsp;"  # &nbsp;
-            else:
-                contents.append(f"@{part.text}&nbsp;")
-        elif isinstance(part, FragLink):
-            url_str = str(part.url)
-            if contents and isinstance(contents[-1], str):
-                contents[-1] += url_str
-            else:
-                contents.append(url_str)
-        elif isinstance(part, FragVideo):
-            video_task = DOWNLOADER.download_video(part.src, ext_headers=headers)
-            cover_task = DOWNLOADER.download_img(part.cover_src, ext_headers=headers)
-            contents.append(VideoContent(video_task, cover_task, part.duration))
-        # 经过测试，所有帖子中的语音均无法播放，无法进行地址捕获
-        # 现在好像也发不了这玩意了
-        # 最近的语音消息在2018年
-        # elif isinstance(part, FragVoice):
-        #     audio_task = DOWNLOADER.download_audio(part.md5, ext_headers=headers)
-        #     contents.append(post.create_audio_content(audio_task, part.duration))
+        if builder := get_builder(type(part)):
+            builder(contents, part)
 
     return contents
 
 
+def _comment_text(part: FragText) -> str:
+    return part.text
+
+
+def _comment_emoji(part: FragEmoji) -> str:
+    return _STICKER_HTML_PREFIX + part.id + '@2x.png">'
+
+
+def _comment_image(part: FragImage) -> str:
+    return _IMAGE_HTML_PREFIX + part.origin_src + _IMAGE_HTML_SUFFIX
+
+
+def _comment_at(part: FragAt) -> str:
+    return f"@{part.text}&nbsp;"
+
+
+def _comment_link(part: FragLink) -> str:
+    return str(part.url)
+
+
+_COMMENT_BUILDERS: dict[type, Callable[[Any], str]] = {
+    FragText: _comment_text,
+    FragEmoji: _comment_emoji,
+    FragImage: _comment_image,
+    FragAt: _comment_at,
+    FragLink: _comment_link,
+}
+"""内容碎片类型到评论 HTML 片段构建函数的映射"""
+
+
 def build_comment_content(contents: Contents) -> str:
     """
     构建帖子评论HTML内容
 
     :param contents: 内容碎片列表
     """
-    content = ""
-    for part in contents.objs:
-        if isinstance(part, FragText):
-            content += part.text
-        elif isinstance(part, FragEmoji):
-            content += f'<img class="sticker small" src="https://tb3.bdstatic.com/emoji/{part.id}@2x.png">'
-        elif isinstance(part, FragImage):
-            content += (
-                '<div class="images-container">'
-                f'<div class="images-grid single">'
-                '<div class="image-item">'
-                f'<img src="{part.origin_src}">'
-                "</div></div></div>"
-            )
-        elif isinstance(part, FragAt):
-            content += f"@{part.text}&nbsp;"
-        elif isinstance(part, FragLink):
-            content += str(part.url)
-    return content
+    get_builder = _COMMENT_BUILDERS.get
+    return "".join([builder(part) for part in contents.objs if (builder := get_builder(type(part)))])
 
 
-def build_comments(posts: list[Post], poster_id: int) -> list[dict[str, Any]]:
+def build_comments(posts: list[Post], poster_id: int) -> list[CommentView]:
     """
     构建帖子评论
 
     :param posts: 评论列表
     :param poster_id: 帖子作者id
     """
-    comments = []
+    comments: list[CommentView] = []
     # 获取前10条评论（优先显示楼主的评论）
-    main_comments = []
-    other_comments = []
+    main_comments: list[Post] = []
+    other_comments: list[Post] = []
 
     for post in posts:  # 跳过主楼
-        if post.user.user_id == poster_id:
-            main_comments.append(post)
-        else:
-            other_comments.append(post)
+        target = main_comments if post.user.user_id == poster_id else other_comments
+        if len(target) < 5:
+            target.append(post)
+        # 两类评论都已取满，无需继续遍历
+        if len(main_comments) == 5 and len(other_comments) == 5:
+            break
 
     # 合并评论，优先显示楼主的评论
-    combined_comments: list[Post] = main_comments[:5] + other_comments[:5]
+    combined_comments: list[Post] = main_comments + other_comments
 
     for post in combined_comments:
         # 处理评论作者信息
-        comment_author = {
-            "name": post.user.show_name,
-            "avatar": f"http://tb.himg.baidu.com/sys/portraith/item/{post.user.portrait}",
-        }
+        user = post.user
+        comment_author = CommentAuthor(user.show_name, AVATAR_PREFIX + user.portrait)
 
         # 处理评论时间
-        formatted_time = ""
-        if post.create_time:
-            with contextlib.suppress(Exception):
-                dt = datetime.fromtimestamp(post.create_time)
-                formatted_time = dt.strftime("%Y-%m-%d %H:%M")
+        formatted_time = _format_time(post.create_time)
         # 处理楼中楼评论
-        child_posts = []
-        if post.comments:
-            for comment in post.comments[:3]:  # 每个评论最多显示3条楼中楼
-                child_author = {
-                    "name": comment.user.show_name,
-                    "avatar": f"http://tb.himg.baidu.com/sys/portraith/item/{comment.user.portrait}",
-                }
-
-                child_formatted_time = ""
-                if hasattr(comment, "create_time") and comment.create_time:
-                    with contextlib.suppress(Exception):
-                        dt = datetime.fromtimestamp(comment.create_time)
-                        child_formatted_time = dt.strftime("%Y-%m-%d %H:%M")
-                child_posts.append(
-                    {
-                        "author": child_author,
-                        "content": build_comment_content(comment.contents),
-                        "formatted_time": child_formatted_time,
-                        "ups": comment.agree,
-                    }
+        child_posts: list[CommentView] = []
+        for comment in post.comments[:3]:  # 每个评论最多显示3条楼中楼
+            child_user = comment.user
+            child_author = CommentAuthor(child_user.show_name, AVATAR_PREFIX + child_user.portrait)
+
+            child_formatted_time = _format_time(comment.create_time)
+            child_posts.append(
+                CommentView(
+                    child_author,
+                    build_comment_content(comment.contents),
+                    child_formatted_time,
+                    comment.agree,
                 )
+            )
 
         comments.append(
-            {
-                "author": comment_author,
-                "content": build_comment_content(post.contents),
-                "formatted_time": formatted_time,
-                "ups": post.agree,
-                "comments": len(child_posts),
-                "child_posts": child_posts,
-            }
+            CommentView(
+                comment_author,
+                build_comment_content(post.contents),
+                formatted_time,
+                post.agree,
+                len(child_posts),
+                child_posts,
+            )
         )
     return comments
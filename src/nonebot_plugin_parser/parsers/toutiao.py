@@ -1,121 +1,132 @@
-import json
+import re
 from re import Match
 from typing import ClassVar
 
+from msgspec import Raw, Struct, DecodeError
 from nonebot import logger
+from msgspec.json import Decoder
 
 from .base import (
     BaseParser,
     PlatformEnum,
     ParseException,
     handle,
+    create_shared_client,
 )
 from .data import Platform, MediaContent
 from ..constants import COMMON_HEADER
 
 
+class ToutiaoData(Struct):
+    url: str | None = None
+    """视频链接"""
+    cover: str | None = None
+    """封面链接"""
+    title: str | None = "无标题"
+    author: str | None = "未知作者"
+    avatar: str | None = None
+    """作者头像"""
+    description: str | None = ""
+
+
+class ToutiaoResponse(Struct):
+    code: int | None = None
+    msg: str | None = "未知错误"
+    data: Raw = Raw()
+    """接口出错时结构不固定, 确认状态后再解析"""
+
+
+_TOUTIAO_RE = re.compile(r"https?://[^\s]*?(?:toutiao\.com|ixigua\.com)/(?:is|video)/[^\s/]+/?")
+"""头条/西瓜视频分享链接"""
+
+_TOUTIAO_HEADERS = {**COMMON_HEADER, "Content-Type": "application/json", "User-Agent": "API-Client/1.0"}
+
+response_decoder = Decoder(ToutiaoResponse)
+data_decoder = Decoder(ToutiaoData)
+
+
 class ToutiaoParser(BaseParser):
     # 平台信息
     platform: ClassVar[Platform] = Platform(name=PlatformEnum.TOUTIAO, display_name="今日头条")
 
-    @handle(
-        "ixigua.com",
-        r"https?://[^\s]*?(?:toutiao\.com|ixigua\.com)/(?:is|video)/[^\s/]+/?",
-    )
-    @handle(
-        "toutiao.com",
-        r"https?://[^\s]*?(?:toutiao\.com|ixigua\.com)/(?:is|video)/[^\s/]+/?",
-    )
+    def __init__(self):
+        super().__init__()
+        self.client = create_shared_client(verify=False)
+
+    @handle(("toutiao.com", "ixigua.com"), _TOUTIAO_RE)
     async def _parse_toutiao_share(self, searched: Match[str]):
         """解析今日头条分享链接"""
         share_url = searched.group(0)
         logger.debug(f"触发今日头条解析: {share_url}")
 
-        from httpx import AsyncClient
-
         # 使用API解析
         try:
-            headers = COMMON_HEADER.copy()
-            headers.update({"Content-Type": "application/json", "User-Agent": "API-Client/1.0"})
-
-            async with AsyncClient(headers=headers, verify=False, timeout=self.timeout) as client:
-                api_url = "https://api.bugpk.com/api/toutiao"
-                params = {"url": share_url}
-                resp = await client.get(api_url, params=params)
-                resp.raise_for_status()
-
-                # 检查响应内容
-                if not resp.content:
-                    raise ParseException("今日头条接口返回空内容")
-
-                try:
-                    # 获取原始响应文本
-                    response_text = resp.text
-
-                    # 提取JSON部分 - 找到第一个{和最后一个}，忽略前面的HTML警告
-                    json_start = response_text.find("{")
-                    json_end = response_text.rfind("}") + 1
-
-                    if json_start != -1 and json_end != -1:
-                        # 提取纯JSON字符串
-                        pure_json = response_text[json_start:json_end]
-                        data = json.loads(pure_json)
-                    else:
-                        # 如果找不到JSON结构，尝试直接解析
-                        data = resp.json()
-                except json.JSONDecodeError as e:
-                    # 记录响应内容以便调试
-                    logger.error(f"今日头条接口返回无效JSON: {resp.text[:100]}...")
-                    raise ParseException(f"今日头条接口返回无效JSON: {e}") from e
-
-                # 检查接口返回状态
-                if data.get("code") != 200:
-                    raise ParseException(f"今日头条接口返回错误: {data.get('msg', '未知错误')}")
-
-                video_data = data.get("data")
-                if not video_data or not isinstance(video_data, dict):
-                    raise ParseException("今日头条接口返回无效数据")
-
-                logger.info(
-                    f"今日头条解析成功: {video_data.get('title', '未知标题')} - {video_data.get('author', '未知作者')}"
-                )
-
-                # 创建视频内容 - 使用get方法安全访问
-                video_url = video_data.get("url")
-                if not video_url or not video_url.startswith("http"):
-                    raise ParseException("无效视频URL")
-
-                # 解析封面 - 使用get方法安全访问
-                cover_url = video_data.get("cover")
-
-                # 创建视频内容
-                video_content = self.create_video(
-                    video_url,
-                    cover_url,
-                    0.0,  # API没有返回时长
-                )
-
-                # 构建内容列表
-                contents: list[MediaContent | str] = [video_data.get("description", ""), video_content]
-
-                # 构建额外信息
-                extra = {
-                    "info": f"作者: {video_data.get('author', '未知作者')}",
-                    "type": "video",
-                    "type_tag": "短视频",
-                    "type_icon": "fa-video",
-                }
-
-                # 构建作者信息 - 安全访问字段
-                author_name = video_data.get("author", "未知作者")
-                author_avatar = video_data.get("avatar")
-
-                return self.result(
-                    title=video_data.get("title", "无标题"),
-                    author=self.create_author(author_name, author_avatar),
-                    url=share_url,
-                    content=contents,
-                    extra=extra,
-                )
+            api_url = "https://api.bugpk.com/api/toutiao"
+            params = {"url": share_url}
+            resp = await self.client.get(api_url, params=params, headers=_TOUTIAO_HEADERS)
+            resp.raise_for_status()
+
+            # 检查响应内容
+            if not resp.content:
+                raise ParseException("今日头条接口返回空内容")
+
+            try:
+                raw = resp.content
+                # 提取JSON部分 - 找到第一个{和最后一个}，忽略前面的HTML警告
+                json_start = raw.find(b"{")
+                json_end = raw.rfind(b"}") + 1
+                if json_start != -1 and json_end > json_start:
+                    raw = raw[json_start:json_end]
+                data = response_decoder.decode(raw)
+            except DecodeError as e:
+                # 记录响应内容以便调试
+                logger.error(f"今日头条接口返回无效JSON: {resp.text[:100]}...")
+                raise ParseException(f"今日头条接口返回无效JSON: {e}") from e
+
+            # 检查接口返回状态
+            if data.code != 200:
+                raise ParseException(f"今日头条接口返回错误: {data.msg}")
+
+            try:
+                video_data = data_decoder.decode(data.data)
+            except DecodeError as e:
+                raise ParseException("今日头条接口返回无效数据") from e
+
+            title, author_name = video_data.title, video_data.author
+            logger.info(f"今日头条解析成功: {title} - {author_name}")
+
+            # 创建视频内容
+            video_url = video_data.url
+            if not video_url or not video_url.startswith("http"):
+                raise ParseException("无效视频URL")
+
+            # 解析封面
+            cover_url = video_data.cover
+
+            # 创建视频内容
+            video_content = self.create_video(
+                video_url,
+                cover_url,
+                0.0,  # API没有返回时长
+            )
+
+            # 构建内容列表
+            contents: list[MediaContent | str] = [video_data.description, video_content]
+
+            # 构建额外信息
+            extra = {
+                "info": f"作者: {author_name}",
+                "type": "video",
+                "type_tag": "短视频",
+                "type_icon": "fa-video",
+            }
+
+            return self.result(
+                title=title,
+                author=self.create_author(author_name, video_data.avatar),
+                url=share_url,
+                content=contents,
+                extra=extra,
+            )
         except Exception as e:
             raise ParseException(f"今日头条解析失败: {e}") from e
@@ -1,11 +1,10 @@
 import re
 from typing import ClassVar
 
-from httpx import AsyncClient
 from msgspec import Struct, field
 from msgspec.json import Decoder
 
-from .base import BaseParser, PlatformEnum, handle
+from .base import BaseParser, PlatformEnum, handle, create_shared_client
 from .data import Platform, ParseResult, MediaContent
 
 
@@ -38,6 +37,10 @@ decoder = Decoder(VxTwitterResponse)
 class TwitterParser(BaseParser):
     platform: ClassVar[Platform] = Platform(name=PlatformEnum.X, display_name="X")
 
+    def __init__(self):
+        super().__init__()
+        self.client = create_shared_client()
+
     @handle("x.com", r"x.com/[0-9-a-zA-Z_]{1,20}/status/([0-9]+)")
     async def _parse(self, searched: re.Match[str]) -> ParseResult:
         url = f"https://{searched.group(0)}"
@@ -47,9 +50,8 @@ class TwitterParser(BaseParser):
         """使用 vxtwitter API 解析 Twitter 链接"""
 
         api_url = url.replace("x.com", "api.vxtwitter.com")
-        async with AsyncClient(headers=self.headers, timeout=self.timeout) as client:
-            response = await client.get(api_url)
-            response.raise_for_status()
+        response = await self.client.get(api_url, headers=self.headers)
+        response.raise_for_status()
 
         data = decoder.decode(response.content)
         return self._collect_result(data)
@@ -1,6 +1,6 @@
 import re
 from typing import ClassVar
-from urllib.parse import parse_qsl
+from urllib.parse import unquote_plus
 
 from curl_cffi import AsyncSession
 
@@ -9,6 +9,10 @@ from ..data import MediaContent
 from .explore import InitialState as exploreInitialState
 from .explore import decoder as exploreDecoder
 
+_INITIAL_STATE_RE = re.compile(rb"window\.__INITIAL_STATE__=(.*?)</script>")
+_XSEC_TOKEN_RE = re.compile(r"(?:^|&)xsec_token=([^&]*)")
+"""只需 xsec_token, 不必解析整个 query string"""
+
 
 class XiaoHongShuParser(BaseParser):
     # 平台信息
@@ -59,19 +63,17 @@ class XiaoHongShuParser(BaseParser):
         note_id = searched["note_id"]
         qs = searched["qs"]
 
-        # 原始 URL（保留所有 query 参数）
-        full_url = f"{xhs_domain}/explore/{note_id}"
-
-        # 解析 query string，检查 xsec_token
-        params_dict = dict(parse_qsl(qs, keep_blank_values=True))
-        xsec_token = params_dict.get("xsec_token")
+        # 从 query string 中提取 xsec_token
+        matched = _XSEC_TOKEN_RE.search(qs)
+        xsec_token = unquote_plus(matched[1]) if matched else None
         if not xsec_token:
             # TODO: 无需 xsec_token 解析, 即自动搜索获取 xsec_token
             # 参考 https://github.com/Cloxl/xhshow
             # 使用搜索 API 进行获取, 但极易死号
             raise ParseException("缺少 xsec_token, 无法解析小红书链接")
 
-        full_url += f"?xsec_token={xsec_token}&xsec_source=pc_share"
+        # 统一使用 explore 链接
+        full_url = f"{xhs_domain}/explore/{note_id}?xsec_token={xsec_token}&xsec_source=pc_share"
 
         return await self.parse_explore(full_url, note_id)
 
@@ -83,10 +85,12 @@ class XiaoHongShuParser(BaseParser):
         # may be 302
         if response.status_code > 400:
             response.raise_for_status()
-        html = response.text
-        pattern = r"window\.__INITIAL_STATE__=(.*?)</script>"
-        if matched := re.search(pattern, html):
-            raw = matched[1].replace("undefined", "null")
+        # 直接在字节上匹配, 省去整页 HTML 的解码
+        if matched := _INITIAL_STATE_RE.search(response.content):
+            raw = matched[1]
+            # 大多数页面不含 undefined, 此时省去一次整段拷贝
+            if b"undefined" in raw:
+                raw = raw.replace(b"undefined", b"null")
         else:
             raise ParseException("小红书分享链接失效或内容已删除")
         return exploreDecoder.decode(raw)
@@ -120,6 +124,7 @@ class XiaoHongShuParser(BaseParser):
     async def parse_explore(self, url: str, note_id: str):
         init_state = await self._fetch_initial_state(url)
         note_detail = init_state.note.noteDetailMap[note_id].note
+        image_urls, live_urls = note_detail.collect_media()
 
         return self._build_result_from_note(
             title=note_detail.title,
@@ -127,7 +132,7 @@ class XiaoHongShuParser(BaseParser):
             author_name=note_detail.nickname,
             author_avatar=note_detail.avatar_url,
             video_url=note_detail.video_url,
-            live_urls=note_detail.live_urls,
-            image_urls=note_detail.image_urls,
+            live_urls=live_urls,
+            image_urls=image_urls,
             timestamp=note_detail.lastUpdateTime // 1000,
         )
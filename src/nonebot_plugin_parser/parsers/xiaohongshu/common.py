@@ -3,18 +3,18 @@ from typing import Any
 from msgspec import Struct
 
 
-class Stream(Struct):
+class Stream(Struct, gc=False, frozen=True):
     h264: list[dict[str, Any]] | None = None
     h265: list[dict[str, Any]] | None = None
     av1: list[dict[str, Any]] | None = None
     h266: list[dict[str, Any]] | None = None
 
 
-class Media(Struct):
+class Media(Struct, gc=False, frozen=True):
     stream: Stream
 
 
-class Video(Struct):
+class Video(Struct, gc=False, frozen=True):
     media: Media
 
     @property
@@ -22,12 +22,7 @@ class Video(Struct):
         stream = self.media.stream
 
         # h264 有水印，h265 无水印
-        if stream.h265:
-            return stream.h265[0]["masterUrl"]
-        elif stream.h264:
-            return stream.h264[0]["masterUrl"]
-        elif stream.av1:
-            return stream.av1[0]["masterUrl"]
-        elif stream.h266:
-            return stream.h266[0]["masterUrl"]
+        for stream_list in (stream.h265, stream.h264, stream.av1, stream.h266):
+            if stream_list:
+                return stream_list[0]["masterUrl"]
         return None
@@ -4,7 +4,7 @@ from msgspec.json import Decoder
 from .common import Video
 
 
-class StreamUrl(Struct):
+class StreamUrl(Struct, gc=False, frozen=True):
     """Wrapper for stream url"""
 
     masterUrl: str
@@ -13,7 +13,7 @@ class StreamUrl(Struct):
     """备选链接"""
 
 
-class ImageStream(Struct):
+class ImageStream(Struct, gc=False, frozen=True):
     """Wrapper for image stream"""
 
     h264: list[StreamUrl] = field(default_factory=list)
@@ -24,13 +24,13 @@ class ImageStream(Struct):
     @property
     def stream_url(self) -> str:
         """获取第一个非空流列表中的第一个可用URL，优先级为h264 > h265 > h266 > av1"""
-        return next(
-            (stream_list[0].masterUrl for stream_list in [self.h264, self.h265, self.h266, self.av1] if stream_list),
-            "",
-        )
+        for stream_list in (self.h264, self.h265, self.h266, self.av1):
+            if stream_list:
+                return stream_list[0].masterUrl
+        return ""
 
 
-class Image(Struct):
+class Image(Struct, gc=False, frozen=True):
     urlDefault: str
     livePhoto: bool
     """是否为动态图片(即视频)"""
@@ -49,12 +49,12 @@ class Image(Struct):
         return None
 
 
-class User(Struct):
+class User(Struct, gc=False, frozen=True):
     nickname: str
     avatar: str
 
 
-class NoteDetail(Struct):
+class NoteDetail(Struct, gc=False, frozen=True):
     type: str
     """类型，一般是normal/video"""
     title: str
@@ -74,33 +74,39 @@ class NoteDetail(Struct):
     def avatar_url(self) -> str:
         return self.user.avatar
 
-    @property
-    def image_urls(self) -> list[str]:
-        return [image.urlDefault for image in self.imageList]
-
     @property
     def video_url(self) -> str | None:
         if self.video:
             return self.video.video_url
 
-    @property
-    def live_urls(self) -> list[tuple[str, str]]:
-        return [image.live_url for image in self.imageList if image.live_url]
+    def collect_media(self) -> tuple[list[str], list[tuple[str, str]]]:
+        """
+        一次遍历同时收集图片与live图片地址
+
+        :return: 图片地址列表, (live视频地址, live图片底图)列表
+        """
+        image_urls: list[str] = []
+        live_urls: list[tuple[str, str]] = []
+        for image in self.imageList:
+            image_urls.append(image.urlDefault)
+            if live_url := image.live_url:
+                live_urls.append(live_url)
+        return image_urls, live_urls
 
 
-class NoteDetailWrapper(Struct):
+class NoteDetailWrapper(Struct, gc=False, frozen=True):
     """Wrapper for note detail, represents the value in noteDetailMap[xhs_id]"""
 
     note: NoteDetail
 
 
-class Note(Struct):
+class Note(Struct, gc=False, frozen=True):
     """Top-level note container with noteDetailMap"""
 
     noteDetailMap: dict[str, NoteDetailWrapper]
 
 
-class InitialState(Struct):
+class InitialState(Struct, gc=False, frozen=True):
     """Root structure of window.__INITIAL_STATE__"""
 
     note: Note
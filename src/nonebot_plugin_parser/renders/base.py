@@ -1,12 +1,18 @@
-import uuid
+import os
+import time
+import base64
 import datetime
 from io import BytesIO
 from typing import Any, ClassVar
+from asyncio import gather, to_thread
 from pathlib import Path
+from itertools import count
 from collections.abc import AsyncGenerator
 
 import qrcode  # pyright: ignore[reportMissingModuleSource]
+from jinja2 import Environment, FileSystemLoader
 from nonebot import logger, require
+from qrcode.image.pil import PilImage  # pyright: ignore[reportMissingModuleSource]
 
 from .utils import build_html, build_plain_text
 from ..config import pconfig, _nickname
@@ -22,7 +28,74 @@ from ..parsers.data import (
 )
 
 require("nonebot_plugin_htmlrender")
-from nonebot_plugin_htmlrender import template_to_pic
+from nonebot_plugin_htmlrender import html_to_pic
+
+_AV_TYPES = frozenset((VideoContent, AudioContent))
+"""音视频内容类型"""
+_IMAGE_TYPES = frozenset((ImageContent, GraphicsContent))
+"""图片类内容类型"""
+_FILE_PREFIX = f"{os.getpid()}_{int(time.time()):x}"
+"""渲染图文件名前缀, 进程号与启动时间保证跨进程、跨重启不重名"""
+_FILE_COUNTER = count()
+"""渲染图文件名序号"""
+_MUSIC_PLATFORMS = frozenset(("kugou", "netease", "kuwo", "qsmusic"))
+"""使用音乐模板的平台"""
+_QR_CACHE: dict[str, str] = {}
+"""链接到二维码 data URI 的缓存, 只在事件循环中读写"""
+_QR_CACHE_SIZE = 256
+"""二维码缓存上限"""
+
+
+def _qr_data_uri(url: str) -> str:
+    """生成链接二维码, 返回 base64 编码的 data URI"""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=1,  # ERROR_CORRECT_L 的数值
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(url)
+    qr.make(fit=True)
+    img = qr.make_image(image_factory=PilImage, fill_color="black", back_color="white")
+
+    # 二维码图很小, 低压缩等级几乎不增大体积, 却省下大半 zlib 耗时
+    buffer = BytesIO()
+    img.save(buffer, format="PNG", compress_level=1)
+    img_base64 = base64.b64encode(buffer.getbuffer()).decode("ascii")
+    return f"data:image/png;base64,{img_base64}"
+
+
+async def _qr_code(url: str) -> str:
+    """获取链接二维码, 仅在缓存未命中时到线程中绘制, 不阻塞事件循环"""
+    if (uri := _QR_CACHE.get(url)) is None:
+        uri = await to_thread(_qr_data_uri, url)
+        if len(_QR_CACHE) >= _QR_CACHE_SIZE:
+            # 淘汰最早加入的一项
+            del _QR_CACHE[next(iter(_QR_CACHE))]
+        _QR_CACHE[url] = uri
+    return uri
+
+
+def _plain_text(result: ParseResult) -> str:
+    """获取解析结果的纯文本内容, 同一结果只构建一次"""
+    if result.plain_text is None:
+        result.plain_text = build_plain_text(result.content)
+    return result.plain_text
+
+
+def _save_png(cache_dir: Path, raw: bytes) -> Path:
+    """保存渲染图, 先写临时文件再替换, 读取方不会看到写了一半的图片"""
+    stem = f"{_FILE_PREFIX}_{next(_FILE_COUNTER):x}"
+    image_path = cache_dir / f"{stem}.png"
+    tmp_path = cache_dir / f"{stem}.tmp"
+    tmp_path.write_bytes(raw)
+    os.replace(tmp_path, image_path)
+    return image_path
+
+
+async def _none() -> None:
+    """gather 中缺省项的占位"""
+    return None
 
 
 class Renderer:
@@ -30,6 +103,18 @@ class Renderer:
 
     templates_dir: ClassVar[Path] = Path(__file__).parent / "templates"
     """模板目录"""
+    resources_dir: ClassVar[Path] = Path(__file__).parent / "resources"
+    """资源目录"""
+    _template_env: ClassVar[Environment] = Environment(
+        loader=FileSystemLoader(templates_dir), enable_async=True, auto_reload=False
+    )
+    """模板环境, 编译后的模板在各次渲染间复用"""
+    _templates_base_url: ClassVar[str] = templates_dir.as_uri()
+    """模板目录 URI, 作为页面 base_url"""
+    _template_names: ClassVar[frozenset[str]] = frozenset(p.name for p in templates_dir.iterdir())
+    """已有的模板文件名, 启动时扫描一次"""
+    _logo_uris: ClassVar[dict[str, str]] = {p.stem: p.as_uri() for p in resources_dir.glob("*.png")}
+    """平台名 -> logo 文件 URI, 启动时扫描一次"""
 
     async def render_messages(self, result: ParseResult) -> AsyncGenerator[UniMessage[Any], None]:
         """渲染消息
@@ -67,82 +152,82 @@ class Renderer:
         """
         failed_count = 0
         forwardable_segs: list[ForwardNodeInner] = []
-        dynamic_segs: list[ForwardNodeInner] = []
 
         # 用于存储延迟发送的媒体内容
         media_contents: list[MediaContent | Path] = []
 
+        # 按具体类型一次分拣, 内容类型均无子类
+        av_conts: list[MediaContent] = []
+        image_conts: list[MediaContent] = []
         for cont in result.content:
-            match cont:
-                case VideoContent() | AudioContent():
-                    need_delay = pconfig.delay_send_media or pconfig.delay_send_lazy_download
-                    failed, media = await self._handle_media_content(cont, need_delay)
-                    failed_count += failed
-                    if media is not None:
-                        media_contents.append(media)
-                case ImageContent():
-                    try:
-                        path = await cont.get_path()
-                        forwardable_segs.append(UniHelper.img_seg(path))
-                    except (DownloadLimitException, ZeroSizeException):
-                        continue
-                    except DownloadException:
-                        failed_count += 1
-                        continue
-                case GraphicsContent() as graphics:
-                    try:
-                        path = await cont.get_path()
-                        graphics_msg = UniHelper.img_seg(path)
-                        if graphics.alt is not None:
-                            graphics_msg = graphics_msg + graphics.alt
-                        forwardable_segs.append(graphics_msg)
-                    except (DownloadLimitException, ZeroSizeException):
-                        continue
-                    except DownloadException:
-                        failed_count += 1
-                        continue
-
-        if media_contents and (pconfig.delay_send_media or pconfig.delay_send_lazy_download):
+            cont_type = type(cont)
+            if cont_type in _AV_TYPES:
+                av_conts.append(cont)
+            elif cont_type in _IMAGE_TYPES:
+                image_conts.append(cont)
+
+        # 图片类内容先一并并发获取路径, 不被音视频的发送阻塞
+        image_paths = gather(*(cont.get_path() for cont in image_conts), return_exceptions=True)
+
+        lazy_download = pconfig.delay_send_lazy_download
+        need_delay = pconfig.delay_send_media or lazy_download
+        for cont in av_conts:
+            failed, media = await self._handle_media_content(cont, need_delay, lazy_download)
+            failed_count += failed
+            if media is not None:
+                media_contents.append(media)
+
+        for cont, path in zip(image_conts, await image_paths):
+            if isinstance(path, DownloadLimitException | ZeroSizeException):
+                continue
+            if isinstance(path, DownloadException):
+                failed_count += 1
+                continue
+            if isinstance(path, BaseException):
+                raise path
+            image_seg = UniHelper.img_seg(path)
+            if type(cont) is GraphicsContent and cont.alt is not None:
+                image_seg = image_seg + cont.alt
+            forwardable_segs.append(image_seg)
+
+        if media_contents and need_delay:
             result.media_contents = media_contents
 
         if forwardable_segs:
             self._append_forward_text_segments(result, forwardable_segs)
 
             if pconfig.need_forward_contents or len(forwardable_segs) > 4:
-                forward_msg = UniHelper.construct_forward_message(forwardable_segs + dynamic_segs)
+                forward_msg = UniHelper.construct_forward_message(forwardable_segs)
                 yield UniMessage(forward_msg)
             else:
                 yield UniMessage(forwardable_segs)
 
-                if dynamic_segs:
-                    yield UniMessage(UniHelper.construct_forward_message(dynamic_segs))
-
         if failed_count > 0:
             message = f"{failed_count} 项媒体下载失败"
             yield UniMessage(message)
             raise DownloadException(message)
 
     async def _handle_media_content(
-        self, cont: MediaContent, need_delay: bool
+        self, cont: MediaContent, need_delay: bool, lazy_download: bool
     ) -> tuple[int, MediaContent | Path | None]:
         """处理单个音视频内容，返回失败次数增量和可能的延迟发送内容。"""
-        logger.debug(
-            f"处理{type(cont).__name__}，" f"need_delay={need_delay}, lazy_download={pconfig.delay_send_lazy_download}"
-        )
+        logger.debug("处理{}，need_delay={}, lazy_download={}", type(cont).__name__, need_delay, lazy_download)
 
         if need_delay:
-            return await self._handle_delayed_media(cont)
+            return await self._handle_delayed_media(cont, lazy_download)
         return await self._handle_immediate_media(cont)
 
-    async def _handle_delayed_media(self, cont: MediaContent) -> tuple[int, MediaContent | Path | None]:
+    async def _handle_delayed_media(
+        self, cont: MediaContent, lazy_download: bool
+    ) -> tuple[int, MediaContent | Path | None]:
         """处理延迟发送的音视频内容。"""
-        if pconfig.delay_send_lazy_download:
-            logger.debug(f"延迟发送{type(cont).__name__}，缓存MediaContent对象，不立即下载")
+        if lazy_download:
+            logger.debug("延迟发送{}，缓存MediaContent对象，不立即下载", type(cont).__name__)
             return 0, cont
 
         try:
             path = await cont.get_path()
-            logger.debug(f"延迟发送{type(cont).__name__}，已下载，缓存路径: {path}")
+            logger.debug("延迟发送{}，已下载，缓存路径: {}", type(cont).__name__, path)
             return 0, path
         except (DownloadLimitException, ZeroSizeException):
             return 0, None
@@ -153,28 +238,39 @@ class Renderer:
         """处理立即发送的音视频内容。"""
         try:
             path = await cont.get_path()
-            logger.debug(f"立即发送{type(cont).__name__}: {path}")
-
-            if isinstance(cont, VideoContent):
-                if pconfig.need_upload_video:
-                    await UniMessage(UniHelper.file_seg(path)).send()
-                else:
-                    await UniMessage(UniHelper.video_seg(path)).send()
-            elif isinstance(cont, AudioContent):
-                try:
-                    if pconfig.need_upload_audio:
-                        await UniMessage(UniHelper.file_seg(path)).send()
-                    else:
-                        await UniMessage(UniHelper.record_seg(path)).send()
-                except Exception as e:
-                    logger.debug(f"直接发送音频失败，尝试使用群文件发送: {e}")
-                    await UniMessage(UniHelper.file_seg(path)).send()
+            logger.debug("立即发送{}: {}", type(cont).__name__, path)
+
+            # 调用方已按类型分拣, 这里只有视频与音频两种
+            if type(cont) is VideoContent:
+                await self._send_video(path)
+            else:
+                await self._send_audio(path)
             return 0, None
         except (DownloadLimitException, ZeroSizeException):
             return 0, None
         except DownloadException:
             return 1, None
 
+    @staticmethod
+    async def _send_video(path: Path) -> None:
+        """立即发送视频"""
+        if pconfig.need_upload_video:
+            await UniMessage(UniHelper.file_seg(path)).send()
+        else:
+            await UniMessage(UniHelper.video_seg(path)).send()
+
+    @staticmethod
+    async def _send_audio(path: Path) -> None:
+        """立即发送音频, 失败时改用群文件发送"""
+        try:
+            if pconfig.need_upload_audio:
+                await UniMessage(UniHelper.file_seg(path)).send()
+            else:
+                await UniMessage(UniHelper.record_seg(path)).send()
+        except Exception as e:
+            logger.debug(f"直接发送音频失败，尝试使用群文件发送: {e}")
+            await UniMessage(UniHelper.file_seg(path)).send()
+
     def _append_forward_text_segments(
         self,
         result: ParseResult,
@@ -189,20 +285,20 @@ class Renderer:
         if result.repost:
             self._build_result_with_repost(result, forwardable_segs, author_name)
         else:
-            forwardable_segs.append(f"{author_name}：{build_plain_text(result.content)}")
+            forwardable_segs.append(f"{author_name}：{_plain_text(result)}")
 
     def _build_result_with_repost(
         self, result: ParseResult, forwardable_segs: list[ForwardNodeInner], author_name: str
     ):
         assert result.repost
         repost_author = result.repost.author.name if result.repost.author else "未知用户"
-        forwardable_segs.append(f"{author_name}[转发{repost_author}]：{build_plain_text(result.content)}")
+        forwardable_segs.append(f"{author_name}[转发{repost_author}]：{_plain_text(result)}")
 
         repost_text: list[str] = []
         if result.repost.title:
             repost_text.append(result.repost.title)
         if result.repost.content:
-            repost_text.append(build_plain_text(result.repost.content))
+            repost_text.append(_plain_text(result.repost))
 
         if repost_text:
             repost_content = "\n".join(repost_text)
@@ -225,54 +321,41 @@ class Renderer:
         template_name = "card.html.jinja"
         if result.platform:
             # 音乐平台使用音乐模板
-            music_platforms = ["kugou", "netease", "kuwo", "qsmusic"]
             platform_name = result.platform.name.lower()
 
-            if platform_name in music_platforms:
+            if platform_name in _MUSIC_PLATFORMS:
                 template_name = "music.html.jinja"
             else:
                 # 其他平台使用各自的模板
                 file_name = f"{platform_name}.html.jinja"
-                if (self.templates_dir / file_name).exists():
+                if file_name in self._template_names:
                     template_name = file_name
 
-        # from jinja2 import FileSystemLoader, Environment
-
-        # # 创建一个包加载器对象
-        # env = Environment(loader=FileSystemLoader(self.templates_dir))
-        # template = env.get_template(template_name)
-        # # 渲染
-        # with open(f"{self.templates_dir.parent.parent}/{datetime.datetime.now().strftime('%Y-%m-%d-%H%M%S')}.html", "w", encoding="utf8") as f:  # noqa: E501
-        #     f.write(
-        #         template.render(
-        #             **{
-        #                 "result": template_data,
-        #                 "rendering_time": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        #                 "bot_name": _nickname,
-        #             }
-        #         )
-        #     )
-
-        return await template_to_pic(
-            template_path=str(self.templates_dir),
-            template_name=template_name,
+        template = self._template_env.get_template(template_name)
+        html = await template.render_async(
+            result=template_data,
+            rendering_time=datetime.datetime.now().isoformat(sep=" ", timespec="seconds"),
+            bot_name=_nickname,
+        )
+        return await html_to_pic(
+            html,
+            template_path=self._templates_base_url,
             screenshot_timeout=60000,
-            templates={
-                "result": template_data,
-                "rendering_time": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "bot_name": _nickname,
-            },
-            pages={
-                "viewport": {"width": 800, "height": 100},
-                "base_url": f"file://{self.templates_dir}",
-            },
+            viewport={"width": 800, "height": 100},
+            base_url=self._templates_base_url,
         )
 
     async def _resolve_parse_result(self, result: ParseResult) -> dict[str, Any]:
         """解析 ParseResult 为模板可用的字典数据"""
 
-        logo_path = Path(__file__).parent / "resources" / f"{result.platform.name}.png"
-        content = build_html(result.content)
+        # 正文、封面、头像与转发内容互不依赖, 并发获取
+        author, repost = result.author, result.repost
+        content, cover_path, avatar_path, repost_data = await gather(
+            build_html(result.content),
+            result.cover_path,
+            author.get_avatar_path() if author else _none(),
+            self._resolve_parse_result(repost) if repost else _none(),
+        )
 
         # if ori := result.extra.get("origin"):
         #     if oric := ori.get("contents"):
@@ -286,51 +369,30 @@ class Renderer:
             "platform": {
                 "display_name": result.platform.display_name,
                 "name": result.platform.name,
-                "logo_path": (logo_path.as_uri() if logo_path.exists() else None),
+                "logo_path": self._logo_uris.get(result.platform.name),
             },
             "content": content,
-            "cover_path": await result.cover_path,
-            "text": build_plain_text(result.content),
+            "cover_path": cover_path,
+            "text": _plain_text(result),
         }
 
-        if result.author:
-            avatar_path = await result.author.get_avatar_path()
-            author_id = getattr(result.author, "id", None)
+        if author:
+            author_id = getattr(author, "id", None)
             if not author_id and result.extra:
                 author_id = result.extra.get("author_id")
 
             data["author"] = {
-                "name": result.author.name,
+                "name": author.name,
                 "id": author_id,  # 传递 UID
                 "avatar_path": avatar_path.as_uri() if avatar_path else None,
             }
 
-        if result.repost:
-            data["repost"] = await self._resolve_parse_result(result.repost)
+        if repost:
+            data["repost"] = repost_data
 
         # 添加二维码支持
         if pconfig.append_qrcode and result.url:
-            # 生成二维码
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=1,  # ERROR_CORRECT_L 的数值
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(result.url)
-            qr.make(fit=True)
-            img = qr.make_image(fill_color="black", back_color="white")
-
-            # 将二维码转换为 base64 编码
-            buffer = BytesIO()
-            img.save(buffer, format="PNG")  # type: ignore
-            buffer.seek(0)
-            import base64
-
-            img_base64 = base64.b64encode(buffer.getvalue()).decode("utf-8")
-
-            # 添加 base64 编码的图片数据到模板数据
-            data["qr_code_path"] = f"data:image/png;base64,{img_base64}"
+            data["qr_code_path"] = await _qr_code(result.url)
 
         return data
 
@@ -349,7 +411,9 @@ class Renderer:
             result.render_image = image_path
             if pconfig.use_base64:
                 return UniHelper.img_seg(raw=image_raw)
-
+        elif pconfig.use_base64:
+            # 缓存命中时从磁盘读取, 不在解析结果中常驻图片字节
+            return UniHelper.img_seg(raw=await to_thread(result.render_image.read_bytes))
         return UniHelper.img_seg(result.render_image)
 
     @classmethod
@@ -362,10 +426,5 @@ class Renderer:
         Returns:
             Path: 图片路径
         """
-        import aiofiles
-
-        file_name = f"{uuid.uuid4().hex}.png"
-        image_path = pconfig.cache_dir / file_name
-        async with aiofiles.open(image_path, "wb+") as f:
-            await f.write(raw)
-        return image_path
+        # 渲染图一次写完, 单次线程调度即可
+        return await to_thread(_save_png, pconfig.cache_dir, raw)